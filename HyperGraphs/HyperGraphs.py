@@ -1,13 +1,20 @@
 ﻿"""This module is the tools to run on command line."""
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 from functions import highpass, lowpass
 import numpy as np
-from scipy.optimize import curve_fit
+from scipy.optimize import least_squares
 import matplotlib.pyplot as plt
 import csv
 import matplotlib as mpl
 from pathlib import Path
+try:
+    import pyarrow.csv as _pacsv
+    from pyarrow import ArrowInvalid as _ArrowInvalid
+except ImportError:
+    _pacsv = None
+    _ArrowInvalid = ValueError
 
 type _ShapedFArray[
     shape: tuple[int, ...]
@@ -29,28 +36,43 @@ class ExperimentData[
 ]:
     """The data class of the experiment.
 
+    The samples live in one contiguous ``(N, 4)`` buffer whose columns
+    are the frequency, the input voltage, the output voltage and the
+    phase displacement; the attributes are views into it, so the
+    columns stay adjacent in memory.
+
+    The buffer is kept in single precision: the measurements carry a
+    few significant digits at most, and float32 halves the memory
+    traffic of everything downstream.
+
     Parameters
     ----------
+    data : _ShapedFArray[tuple[int, int]]
+        The ``(N, 4)`` array of the measurement rows.
+
+    Attributes
+    ----------
+    frequency : _ShapedFArray[shape]
+        The frequency.
     v_in : _ShapedFArray[shape]
         The input voltage.
     v_out : _ShapedFArray[shape]
         The output voltage.
-    frequency : _ShapedFArray[shape]
-        The frequency.
     phi : _ShapedFArray[shape]
         The phase displacement.
     """
     def __init__(
         self,
-        v_in: _ShapedFArray[shape],
-        v_out: _ShapedFArray[shape],
-        frequency: _ShapedFArray[shape],
-        phi: _ShapedFArray[shape]
+        data: _ShapedFArray[tuple[int, int]]
     ) -> None:
-        self.v_in = v_in
-        self.v_out = v_out
-        self.frequency = frequency
-        self.phi = phi
+        if data.ndim != 2 or data.shape[1] < 4:
+            raise ValueError('Invalid data.')
+        data = data.astype(np.float32, copy=False)
+        self.data = data
+        self.frequency = data[:, 0]
+        self.v_in = data[:, 1]
+        self.v_out = data[:, 2]
+        self.phi = data[:, 3]
 
 
 def load_data(
@@ -80,28 +102,129 @@ def load_data(
     data : ExperimentData[tuple[int]]
         The data.
     """
-    lvin: list[float] = list()
-    lvout: list[float] = list()
-    lf: list[float] = list()
-    lphi: list[float] = list()
     if encoding is None:
         encoding = 'utf_8_sig'
-    with open(fname, encoding=encoding) as csvfile:
-        dialect = csv.Sniffer().sniff(csvfile.read(1024))
+    with open(fname, encoding=encoding, buffering=1024 * 1024) as csvfile:
+        dialect = csv.Sniffer().sniff(csvfile.read(4096))
+        if (
+            _pacsv is not None
+            and encoding.lower().replace('-', '_') in ('utf_8', 'utf_8_sig')
+        ):
+            try:
+                table = _pacsv.read_csv(
+                    fname,
+                    read_options=_pacsv.ReadOptions(use_threads=True),
+                    parse_options=_pacsv.ParseOptions(
+                        delimiter=dialect.delimiter,
+                        quote_char=dialect.quotechar
+                    )
+                )
+                if table.num_columns < 4:
+                    raise ValueError('Invalid CSV.')
+                return ExperimentData(
+                    np.column_stack(
+                        tuple(
+                            table.column(i).to_numpy().astype(
+                                np.float32,
+                                copy=False
+                            )
+                            for i in range(4)
+                        )
+                    )
+                )
+            except _ArrowInvalid:
+                pass
         csvfile.seek(0)
-        reader = csv.reader(csvfile, dialect=dialect)
-        for row in reader:
-            if len(row) < 4:
-                raise ValueError('Invalid CSV.')
-            elif reader.line_num == 1:
-                continue
-            for i, l in enumerate((lf, lvin, lvout, lphi)):
-                l.append(float(row[i]))
-    v_in = np.array(lvin)
-    v_out = np.array(lvout)
-    f = np.array(lf)
-    phi = np.array(lphi)
-    return ExperimentData(v_in, v_out, f, phi)
+        try:
+            data = np.loadtxt(
+                csvfile,
+                dtype=np.float32,
+                delimiter=dialect.delimiter,
+                skiprows=1,
+                quotechar=dialect.quotechar,
+                ndmin=2
+            )
+            return ExperimentData(data)
+        except ValueError as error:
+            raise ValueError('Invalid CSV.') from error
+
+
+_DISPATCH: dict[bool, tuple[Callable[..., Any], ...]] = {
+    True: (
+        highpass.calc_gain_direct,
+        highpass.calc_gain_from_theory,
+        highpass.calc_gain_from_theory_jac,
+        highpass.calc_voutcosphi_direct,
+        highpass.calc_voutcosphi_from_theory,
+        highpass.calc_voutcosphi_from_theory_jac,
+        highpass.calc_voutsinphi_direct,
+        highpass.calc_voutsinphi_from_theory,
+        highpass.calc_voutsinphi_from_theory_jac,
+    ),
+    False: (
+        lowpass.calc_gain_direct,
+        lowpass.calc_gain_from_theory,
+        lowpass.calc_gain_from_theory_jac,
+        lowpass.calc_voutcosphi_direct,
+        lowpass.calc_voutcosphi_from_theory,
+        lowpass.calc_voutcosphi_from_theory_jac,
+        lowpass.calc_voutsinphi_direct,
+        lowpass.calc_voutsinphi_from_theory,
+        lowpass.calc_voutsinphi_from_theory_jac,
+    ),
+}
+"""The pre-resolved function set per filter kind, keyed by ``hilo``."""
+
+
+def _fit(
+    model: Callable[..., _Array1DF],
+    jac: Callable[..., np.ndarray],
+    frequency: _Array1DF,
+    points: _Array1DF,
+    p0: list[float]
+) -> tuple[_Array1DF, np.ndarray]:
+    """Fits the model to the points with ``least_squares``.
+
+    This drives ``scipy.optimize.least_squares`` directly with the
+    analytical Jacobian instead of going through ``curve_fit``, and
+    rebuilds the parameter covariance the same way ``curve_fit`` does.
+
+    Parameters
+    ----------
+    model : Callable
+        The theoretical function of ``(frequency, *parameters)``.
+    jac : Callable
+        The Jacobian of ``model`` with the same signature.
+    frequency : _Array1DF
+        The frequency.
+    points : _Array1DF
+        The measured values to fit.
+    p0 : list[float]
+        The initial parameters.
+
+    Returns
+    -------
+    popt : _Array1DF
+        The fitted parameters.
+    pcov : np.ndarray
+        The covariance matrix of the parameters.
+    """
+    result = least_squares(
+        lambda p: model(frequency, *p) - points,
+        p0,
+        jac=lambda p: jac(frequency, *p),
+        method='trf',
+        x_scale='jac',
+        ftol=1e-5,
+        xtol=1e-5
+    )
+    dof = len(points) - len(p0)
+    if dof > 0:
+        s_sq = 2 * result.cost / dof
+    else:
+        s_sq = np.nan
+    pcov = np.linalg.pinv(result.jac.T @ result.jac) * s_sq
+    return result.x, pcov
 
 
 def plotter(
@@ -136,7 +259,8 @@ def plotter(
             np.floating[Any]
         ],
         _Array1DF
-    ]
+    ],
+    tuple[_Array1DF, _Array1DF, _Array1DF, _Array1DF]
 ]:
     """Fit the curve and outputs the graphs.
 
@@ -168,6 +292,11 @@ def plotter(
         The function of ``v_out * np.cos(phi)``.
     h2 : Callable
         The function to calculate ``v_out \\* np.sin(phi)``.
+    curves : tuple[_Array1DF, _Array1DF, _Array1DF, _Array1DF]
+        The plotted frequency grid together with the gain and the two
+        phase component curves evaluated on it, so that
+        :func:`save_point` can reuse them instead of evaluating the
+        models again.
     """
     f1: Callable[[_Array1DF, _Array1DF], _Array1DF]
     f2: Callable[
@@ -209,91 +338,43 @@ def plotter(
     ]
     if tau is None:
         tau = 1e-4
-    if hilo:
-        f1 = highpass.calc_gain_direct
-        f2 = highpass.calc_gain_from_theory
-        g1 = highpass.calc_voutcosphi_direct
-        g2 = highpass.calc_voutcosphi_from_theory
-        h1 = highpass.calc_voutsinphi_direct
-        h2 = highpass.calc_voutsinphi_from_theory
-    else:
-        f1 = lowpass.calc_gain_direct
-        f2 = lowpass.calc_gain_from_theory
-        g1 = lowpass.calc_voutcosphi_direct
-        g2 = lowpass.calc_voutcosphi_from_theory
-        h1 = lowpass.calc_voutsinphi_direct
-        h2 = lowpass.calc_voutsinphi_from_theory
+    f1, f2, f2j, g1, g2, g2j, h1, h2, h2j = _DISPATCH[bool(hilo)]
     points_voutsinphi = h1(data.v_out, data.phi)
     points_gain = f1(data.v_in, data.v_out)
     points_voutcosphi = g1(data.v_out, data.phi)
+    vin_mean = float(data.v_in.mean())
     if not nophi1:
-        fit_gain, err_gain = curve_fit(
-            f2,
-            data.frequency,
-            points_gain,
-            np.array(
-                (
-                    tau,
-                )
-            )
-        )
-        fit_voutcosphi, err_voutcosphi = curve_fit(
-            g2,
-            data.frequency,
-            points_voutcosphi,
-            np.array(
-                (
-                    tau,
-                    np.mean(data.v_in),
-                    0
-                )
-            )
-        )
-        fit_voutsinphi, err_voutsinphi = curve_fit(
-            h2,
-            data.frequency,
-            points_voutsinphi,
-            np.array(
-                (
-                    tau,
-                    np.mean(data.v_in),
-                    0
-                )
-            )
-        )
+        p0_phase = [tau, vin_mean, 0.0]
     else:
-        fit_gain, err_gain = curve_fit(
+        p0_phase = [tau, vin_mean]
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        future_gain = executor.submit(
+            _fit,
             f2,
+            f2j,
             data.frequency,
             points_gain,
-            np.array(
-                (
-                    tau,
-                )
-            )
+            [tau]
         )
-        fit_voutcosphi, err_voutcosphi = curve_fit(
+        future_voutcosphi = executor.submit(
+            _fit,
             g2,
+            g2j,
             data.frequency,
             points_voutcosphi,
-            np.array(
-                (
-                    tau,
-                    np.mean(data.v_in)
-                )
-            )
+            p0_phase
         )
-        fit_voutsinphi, err_voutsinphi = curve_fit(
+        future_voutsinphi = executor.submit(
+            _fit,
             h2,
+            h2j,
             data.frequency,
             points_voutsinphi,
-            np.array(
-                (
-                    tau,
-                    np.mean(data.v_in)
-                )
-            )
+            p0_phase
         )
+        fit_gain, err_gain = future_gain.result()
+        fit_voutcosphi, err_voutcosphi = future_voutcosphi.result()
+        fit_voutsinphi, err_voutsinphi = future_voutsinphi.result()
     ax1: mpl.axes.Axes
     ax2: mpl.axes.Axes
     ax3: mpl.axes.Axes
@@ -302,28 +383,31 @@ def plotter(
                                       subplot_kw=dict(box_aspect=18 / 25),
                                       layout='constrained')
     fig.set_size_inches(21, 13/3-1)
-    frange = np.log10(np.max(data.frequency) / np.min(data.frequency))
-    fremin = np.log10(np.min(data.frequency)) - frange * .05
-    fremin = 10 ** fremin
-    fremax = np.log10(np.max(data.frequency)) + frange * .05
-    fremax = 10 ** fremax
+    fmin = float(data.frequency.min())
+    fmax = float(data.frequency.max())
+    frange = np.log10(fmax / fmin)
+    fremin = fmin * 10 ** (-frange * .05)
+    fremax = fmax * 10 ** (frange * .05)
+    fs1 = np.geomspace(fremin, fremax, 64)
+    gcurve = f2(fs1, *fit_gain)
+    ccurve = g2(fs1, *fit_voutcosphi)
+    scurve = h2(fs1, *fit_voutsinphi)
     ax1.plot(data.frequency, points_gain, '.')
-    fs1 = np.geomspace(fremin, fremax, 256)
-    ax1.plot(fs1, f2(fs1, *fit_gain), '-')
+    ax1.plot(fs1, gcurve, '-')
     ax1.set_xscale('log')
     ax1.set_xlabel('$f / \\text{Hz}$')
     ax1.set_ylabel('$G / \\text{dB}$')
     ax1.grid()
     ax1.grid(which='minor', color='0.9')
     ax2.plot(data.frequency, points_voutcosphi, '.')
-    ax2.plot(fs1, g2(fs1, *fit_voutcosphi), '-')
+    ax2.plot(fs1, ccurve, '-')
     ax2.set_xscale('log')
     ax2.set_xlabel('$f / \\text{Hz}$')
     ax2.set_ylabel('$V_{\\text{out}} \\cos \\phi / \\text{V}$')
     ax2.grid()
     ax2.grid(which="minor", color="0.9")
     ax3.plot(data.frequency, points_voutsinphi, '.')
-    ax3.plot(fs1, h2(fs1, *fit_voutsinphi), '-')
+    ax3.plot(fs1, scurve, '-')
     ax3.set_xlabel('$f / \\text{Hz}$')
     ax3.set_ylabel('$V_{\\text{out}} \\sin \\phi / \\text{V}$')
     ax3.set_xscale('log')
@@ -342,7 +426,15 @@ def plotter(
         print('[tau, V_in, Phi_1] =', fit_voutsinphi)
         print('Standard Errors:')
         print(np.sqrt(np.diag(err_voutsinphi)))
-    return fit_gain, fit_voutcosphi, fit_voutsinphi, f2, g2, h2
+    return (
+        fit_gain,
+        fit_voutcosphi,
+        fit_voutsinphi,
+        f2,
+        g2,
+        h2,
+        (fs1, gcurve, ccurve, scurve)
+    )
 
 
 def save_point(
@@ -372,7 +464,13 @@ def save_point(
             np.floating[Any]
         ],
         _Array1DF
-    ]
+    ],
+    curves: tuple[
+        _Array1DF,
+        _Array1DF,
+        _Array1DF,
+        _Array1DF
+    ] | None = None
 ) -> None:
     """Outputs the result points onto a csv file.
 
@@ -391,18 +489,25 @@ def save_point(
     f2 : Callable
     g2 : Callable
     h2 : Callable
+    curves : tuple[_Array1DF, _Array1DF, _Array1DF, _Array1DF] | None, optional
+        The grid and curves already evaluated by :func:`plotter`.
+        They are written out as they are when the grid matches the
+        output grid; otherwise the models are evaluated here.
     """
-    r1 = np.arange(10, 50, 1)
-    r2 = np.arange(50, 100, 2)
-    r3 = np.arange(100, 500, 10)
-    r4 = np.arange(500, 1000, 20)
-    r5 = np.arange(1000, 5000, 100)
-    r6 = np.arange(5000, 10000, 200)
-    r7 = np.arange(1e4, 5e4, 1e3)
-    r8 = np.arange(5e4, 1e5, 2e3)
-    r9 = np.arange(1e5, 5e5, 1e4)
-    r10 = np.arange(5e5, 1e6, 2e4)
-    frequency = np.array((*r1, *r2, *r3, *r4, *r5, *r6, *r7, *r8, *r9, *r10,))
+    frequency = np.concatenate(
+        (
+            np.arange(10, 50, 1),
+            np.arange(50, 100, 2),
+            np.arange(100, 500, 10),
+            np.arange(500, 1000, 20),
+            np.arange(1000, 5000, 100),
+            np.arange(5000, 10000, 200),
+            np.arange(1e4, 5e4, 1e3),
+            np.arange(5e4, 1e5, 2e3),
+            np.arange(1e5, 5e5, 1e4),
+            np.arange(5e5, 1e6, 2e4),
+        )
+    )
     with open(target, 'w', encoding='utf_8_sig', newline='') as file:
         writer = csv.writer(file)
         writer.writerow(
@@ -413,15 +518,18 @@ def save_point(
                 'V(out) sin Phi / V',
             )
         )
-        gain = f2(frequency, *fit_gain)
-        voutcosphi = g2(frequency, *fit_voutcosphi)
-        voutsinphi = h2(frequency, *fit_voutsinphi)
-        for i in range(len(gain)):
-            writer.writerow(
-                (
-                    frequency[i],
-                    gain[i],
-                    voutcosphi[i],
-                    voutsinphi[i],
-                )
+        if curves is not None and np.array_equal(curves[0], frequency):
+            gain, voutcosphi, voutsinphi = curves[1:]
+        else:
+            gain = f2(frequency, *fit_gain)
+            voutcosphi = g2(frequency, *fit_voutcosphi)
+            voutsinphi = h2(frequency, *fit_voutsinphi)
+        stacked = np.column_stack(
+            (
+                frequency,
+                gain,
+                voutcosphi,
+                voutsinphi,
             )
+        )
+        writer.writerows(stacked.tolist())
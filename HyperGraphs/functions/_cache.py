@@ -0,0 +1,48 @@
+﻿"""The cache of the angular frequency shared by the kernels.
+
+``scipy.optimize.least_squares`` hands the same frequency array to
+the model and its Jacobian on every iteration, so the angular
+frequency only needs to be derived once per array.
+"""
+import numpy as np
+from math import pi as _PI
+from typing import Any
+from ._types import _Array1D
+
+_TWO_PI = 2.0 * _PI
+
+_last: tuple[_Array1D, _Array1D] | None = None
+
+
+def _omega(frequency: _Array1D) -> _Array1D:
+    """Returns ``2 * np.pi * frequency``, remembered per array object.
+
+    The most recent frequency array is kept together with its angular
+    frequency, so repeated calls on the identical array (as happens on
+    every fit iteration) skip the multiplication entirely.
+
+    Parameters
+    ----------
+    frequency : _Array1D
+        The frequency.
+
+    Returns
+    -------
+    omega : _Array1D
+        The angular frequency.
+
+    Notes
+    -----
+    The cache is keyed on the array object itself, so a frequency
+    array must not be mutated in place between calls. The pair is held
+    in one tuple assigned atomically, which keeps the cache consistent
+    when the fits run on several threads.
+    """
+    global _last
+    last = _last
+    if last is not None and last[0] is frequency:
+        return last[1]
+    omega = _TWO_PI * frequency
+    if isinstance(frequency, np.ndarray):
+        _last = (frequency, omega)
+    return omega
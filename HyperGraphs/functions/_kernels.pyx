@@ -0,0 +1,111 @@
+﻿# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+"""The optional compiled kernels of the theoretical functions.
+
+This extension is not required: the pure NumPy and numba paths stay
+available without it. Build it in place with::
+
+    cythonize -i HyperGraphs/functions/_kernels.pyx
+
+The kernels mirror the fused phase calculators and the gain
+calculators of ``functions.highpass`` and ``functions.lowpass``.
+"""
+import numpy as np
+from libc.math cimport sqrt, sin, cos, log10, M_PI
+
+ctypedef fused real:
+    float
+    double
+
+
+def voutcossin_hp(const real[:] frequency, double tau, double v_in,
+                  double phi_1):
+    """Both phase components of the high pass output at once."""
+    cdef Py_ssize_t n = frequency.shape[0]
+    if real is float:
+        dtype = np.float32
+    else:
+        dtype = np.float64
+    out_cos = np.empty(n, dtype=dtype)
+    out_sin = np.empty(n, dtype=dtype)
+    cdef real[::1] oc = out_cos
+    cdef real[::1] os = out_sin
+    cdef double c1 = cos(phi_1)
+    cdef double s1 = sin(phi_1)
+    cdef double omegatau, inv_den, cosine, sine, vout
+    cdef Py_ssize_t i
+    with nogil:
+        for i in range(n):
+            omegatau = 2 * M_PI * tau * frequency[i]
+            inv_den = 1 / sqrt(omegatau * omegatau + 1)
+            cosine = omegatau * inv_den
+            sine = inv_den
+            vout = v_in * cosine
+            oc[i] = <real> (vout * (cosine * c1 - sine * s1))
+            os[i] = <real> (vout * (sine * c1 - cosine * s1))
+    return out_cos, out_sin
+
+
+def voutcossin_lp(const real[:] frequency, double tau, double v_in,
+                  double phi_1):
+    """Both phase components of the low pass output at once."""
+    cdef Py_ssize_t n = frequency.shape[0]
+    if real is float:
+        dtype = np.float32
+    else:
+        dtype = np.float64
+    out_cos = np.empty(n, dtype=dtype)
+    out_sin = np.empty(n, dtype=dtype)
+    cdef real[::1] oc = out_cos
+    cdef real[::1] os = out_sin
+    cdef double c1 = cos(phi_1)
+    cdef double s1 = sin(phi_1)
+    cdef double omegatau, inv_den, cosine, sine, vout
+    cdef Py_ssize_t i
+    with nogil:
+        for i in range(n):
+            omegatau = 2 * M_PI * tau * frequency[i]
+            inv_den = 1 / sqrt(omegatau * omegatau + 1)
+            cosine = inv_den
+            sine = omegatau * inv_den
+            vout = v_in * inv_den
+            oc[i] = <real> (vout * (cosine * c1 - sine * s1))
+            os[i] = <real> (vout * (cosine * s1 - sine * c1))
+    return out_cos, out_sin
+
+
+def gain_hp(const real[:] frequency, double tau):
+    """The theoretical gain of the high pass filter."""
+    cdef Py_ssize_t n = frequency.shape[0]
+    if real is float:
+        dtype = np.float32
+    else:
+        dtype = np.float64
+    out = np.empty(n, dtype=dtype)
+    cdef real[::1] og = out
+    cdef double omegatau
+    cdef Py_ssize_t i
+    with nogil:
+        for i in range(n):
+            omegatau = 2 * M_PI * tau * frequency[i]
+            og[i] = <real> (
+                -10 * log10(1 / (omegatau * omegatau) + 1)
+            )
+    return out
+
+
+def gain_lp(const real[:] frequency, double tau):
+    """The theoretical gain of the low pass filter."""
+    cdef Py_ssize_t n = frequency.shape[0]
+    if real is float:
+        dtype = np.float32
+    else:
+        dtype = np.float64
+    out = np.empty(n, dtype=dtype)
+    cdef real[::1] og = out
+    cdef double omegatau
+    cdef Py_ssize_t i
+    with nogil:
+        for i in range(n):
+            omegatau = 2 * M_PI * tau * frequency[i]
+            og[i] = <real> (-10 * log10(omegatau * omegatau + 1))
+    return out
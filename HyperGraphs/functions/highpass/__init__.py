@@ -32,4 +32,5 @@ Clalculates the orthological component of the output voltage.
 """
 from ._gain import *
 from ._voutc import *
+from ._voutcs import _voutcossin_from_theory
 from ._vouts import *
@@ -1,7 +1,39 @@
 ﻿"""This is the module to calculate gains."""
 import numpy as np
+from math import log as _log
 from typing import Any
 from .._types import _Array1D, _ArrayInShape
+from .._cache import _omega
+
+_LN10 = _log(10)
+try:
+    from .. import _kernels as _ckernels
+except ImportError:
+    _ckernels = None
+try:
+    from numba import njit as _njit
+except ImportError:
+    _njit = None
+try:
+    import numexpr as _ne
+except ImportError:
+    _ne = None
+
+if _njit is not None:
+    @_njit(cache=True, fastmath=True)
+    def _gain_core(frequency: np.ndarray, tau: float) -> np.ndarray:
+        """The compiled scalar loop behind ``calc_gain_from_theory``."""
+        n = frequency.shape[0]
+        gain = np.empty(n, frequency.dtype)
+        for i in range(n):
+            omegatau = 2 * np.pi * tau * frequency[i]
+            squared = 1 / (omegatau * omegatau) + 1
+            gain[i] = -10 * np.log10(squared)
+        return gain
+
+    _gain_core(np.ones(1), 1.0)
+else:
+    _gain_core = None
 
 
 def calc_gain_direct[
@@ -37,6 +69,11 @@ def calc_gain_direct[
     -----
     Please do not call this function directly.
     """
+    if _ne is not None:
+        return _ne.evaluate(
+            '20.0 * log10(v_out / v_in)',
+            local_dict={'v_out': v_out, 'v_in': v_in}
+        )
     return 20 * np.log10(v_out / v_in)
 
 
@@ -60,11 +97,56 @@ def calc_gain_from_theory(
 
     Notes
     -----
-    This is made to be used in the ``scipy.optimize.curve_fit`` function.
+    This is made to be fitted through ``scipy.optimize.least_squares``.
 
     The function is not considered to be called by users directly.
     """
-    omega = 2 * np.pi * frequency
-    squared = (1 / (omega * tau)) ** 2 + 1
-    denominator = np.sqrt(squared)
-    return 20 * np.log10(1 / denominator)
+    if (
+        _ckernels is not None
+        and isinstance(frequency, np.ndarray)
+        and frequency.dtype in (np.float32, np.float64)
+    ):
+        return _ckernels.gain_hp(frequency, float(tau))
+    if (
+        _gain_core is not None
+        and isinstance(frequency, np.ndarray)
+        and frequency.dtype in (np.float32, np.float64)
+    ):
+        return _gain_core(frequency, float(tau))
+    omegatau = tau * _omega(frequency)
+    if _ne is not None:
+        return _ne.evaluate(
+            '-10.0 * log10(1.0 / (omegatau * omegatau) + 1.0)',
+            local_dict={'omegatau': omegatau}
+        )
+    squared = 1 / (omegatau * omegatau) + 1
+    return -10 * np.log10(squared)
+
+
+def calc_gain_from_theory_jac(
+    frequency: _Array1D,
+    tau: np.floating[Any]
+) -> np.ndarray:
+    """The Jacobian of :func:`calc_gain_from_theory`.
+
+    Parameters
+    ----------
+    frequency : _Array1D
+        The values of frequencies of the voltage of source.
+    tau : floating[Any]
+        The time constant.
+
+    Returns
+    -------
+    jacobian : np.ndarray
+        The ``(N, 1)`` array of the derivative of the gain
+        with respect to ``tau``.
+
+    Notes
+    -----
+    This is made to be given to ``scipy.optimize.least_squares`` as
+    the ``jac`` argument so that no finite difference step is needed.
+    """
+    omegatau = tau * _omega(frequency)
+    dgain = 20 / (_LN10 * tau * (omegatau * omegatau + 1))
+    return dgain.reshape(-1, 1)
@@ -5,6 +5,8 @@ This module is for high pass filters.
 from typing import Any
 import numpy as np
 from .._types import _ArrayInShape, _Array1D
+from .._cache import _omega
+from ._voutcs import _voutcossin_from_theory
 
 
 def calc_voutcosphi_direct[
@@ -68,11 +70,57 @@ def calc_voutcosphi_from_theory(
     voutcosphi : _Array1D
         The same-phase value of the output voltage.
     """
-    omegatau = 2 * np.pi * tau * frequency
-    den = omegatau ** 2 + 1
-    den = np.sqrt(den)
-    sine = 1 / den
-    cosine = omegatau / den
-    cosineval = cosine * np.cos(phi_1) - sine * np.sin(phi_1)
-    vout = v_in / np.sqrt(omegatau ** (-2) + 1)
-    return vout * cosineval
+    return _voutcossin_from_theory(frequency, tau, v_in, phi_1)[0]
+
+
+def calc_voutcosphi_from_theory_jac(
+    frequency: _Array1D,
+    tau: np.floating[Any],
+    v_in: np.floating[Any],
+    phi_1: np.floating[Any] | None = None
+) -> np.ndarray:
+    """The Jacobian of :func:`calc_voutcosphi_from_theory`.
+
+    Parameters
+    ----------
+    frequency : _Array1D
+        The frequency data.
+    tau : floating[Any]
+        The time constant.
+    v_in : floating[Any]
+        The input voltage.
+    phi_1 : floating[Any] | None, optional
+        The phase change of the voltage follower.
+        When this is omitted the fit does not carry ``phi_1``,
+        so its column is left out of the Jacobian.
+
+    Returns
+    -------
+    jacobian : np.ndarray
+        The ``(N, 3)`` array of the partial derivatives with respect
+        to ``tau``, ``v_in`` and ``phi_1``, or the ``(N, 2)`` array
+        without the ``phi_1`` column when ``phi_1`` is omitted.
+
+    Notes
+    -----
+    This is made to be given to ``scipy.optimize.least_squares`` as
+    the ``jac`` argument so that no finite difference step is needed.
+    """
+    nophi1 = phi_1 is None
+    if nophi1:
+        phi_1 = 0
+    omega = _omega(frequency)
+    omegatau = tau * omega
+    inv_sq = 1 / (omegatau * omegatau + 1)
+    c1 = np.cos(phi_1)
+    s1 = np.sin(phi_1)
+    dvin = (omegatau * omegatau * c1 - omegatau * s1) * inv_sq
+    dtau = (
+        v_in * omega
+        * (2 * omegatau * c1 + (omegatau * omegatau - 1) * s1)
+        * inv_sq * inv_sq
+    )
+    if nophi1:
+        return np.stack((dtau, dvin), axis=-1)
+    dphi = -v_in * (omegatau * omegatau * s1 + omegatau * c1) * inv_sq
+    return np.stack((dtau, dvin, dphi), axis=-1)
@@ -0,0 +1,109 @@
+﻿"""The fused kernel shared by the two phase component calculators.
+
+This module is for high pass filters.
+"""
+from typing import Any
+import numpy as np
+from .._types import _Array1D
+from .._cache import _omega
+try:
+    from .. import _kernels as _ckernels
+except ImportError:
+    _ckernels = None
+try:
+    from numba import njit as _njit
+except ImportError:
+    _njit = None
+
+if _njit is not None:
+    @_njit(cache=True, fastmath=True)
+    def _voutcossin_core(
+        frequency: np.ndarray,
+        tau: float,
+        v_in: float,
+        phi_1: float
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """The compiled scalar loop behind ``_voutcossin_from_theory``."""
+        n = frequency.shape[0]
+        voutcosphi = np.empty(n, frequency.dtype)
+        voutsinphi = np.empty(n, frequency.dtype)
+        c1 = np.cos(phi_1)
+        s1 = np.sin(phi_1)
+        for i in range(n):
+            omegatau = 2 * np.pi * tau * frequency[i]
+            inv_den = 1 / np.sqrt(omegatau * omegatau + 1)
+            cosine = omegatau * inv_den
+            sine = inv_den
+            vout = v_in * cosine
+            voutcosphi[i] = vout * (cosine * c1 - sine * s1)
+            voutsinphi[i] = vout * (sine * c1 - cosine * s1)
+        return voutcosphi, voutsinphi
+
+    _voutcossin_core(np.ones(1), 1.0, 1.0, 0.0)
+else:
+    _voutcossin_core = None
+
+
+def _voutcossin_from_theory(
+    frequency: _Array1D,
+    tau: np.floating[Any],
+    v_in: np.floating[Any],
+    phi_1: np.floating[Any] = 0
+) -> tuple[_Array1D, _Array1D]:
+    """Calculates both phase components of the output at once.
+
+    The values ``omegatau``, the denominator, and the trigonometric
+    values of ``phi_1`` are shared by the two components, so deriving
+    them together halves the elementary function evaluations and the
+    temporary arrays compared to two separate calls.
+
+    Parameters
+    ----------
+    frequency : _Array1D
+        The frequency data.
+    tau : floating[Any]
+        The time constant.
+    v_in : floating[Any]
+        The input voltage.
+    phi_1 : floating[Any], optional
+        The phase change of the voltage follower.
+
+    Returns
+    -------
+    voutcosphi : _Array1D
+        The same-phase component of the output voltage.
+    voutsinphi : _Array1D
+        The component of the output voltage orthological to the input.
+    """
+    if (
+        _ckernels is not None
+        and isinstance(frequency, np.ndarray)
+        and frequency.dtype in (np.float32, np.float64)
+    ):
+        return _ckernels.voutcossin_hp(
+            frequency,
+            float(tau),
+            float(v_in),
+            float(phi_1)
+        )
+    if (
+        _voutcossin_core is not None
+        and isinstance(frequency, np.ndarray)
+        and frequency.dtype in (np.float32, np.float64)
+    ):
+        return _voutcossin_core(
+            frequency,
+            float(tau),
+            float(v_in),
+            float(phi_1)
+        )
+    omegatau = tau * _omega(frequency)
+    inv_den = 1 / np.sqrt(omegatau * omegatau + 1)
+    cosine = omegatau * inv_den
+    sine = inv_den
+    c1 = np.cos(phi_1)
+    s1 = np.sin(phi_1)
+    vout = v_in * cosine
+    voutcosphi = vout * (cosine * c1 - sine * s1)
+    voutsinphi = vout * (sine * c1 - cosine * s1)
+    return voutcosphi, voutsinphi
@@ -3,8 +3,10 @@
 Both theoretical and experimental values are supported.
 """
 from .._types import _Array1D, _ArrayInShape
+from .._cache import _omega
 import numpy as np
 from typing import Any
+from ._voutcs import _voutcossin_from_theory
 
 
 def calc_voutsinphi_direct[
@@ -66,11 +68,56 @@ def calc_voutsinphi_from_theory(
     voutcosphi : _Array1D
         The value of the output voltage component orthological to the input.
     """
-    omegatau = 2 * np.pi * tau * frequency
-    den = omegatau ** 2 + 1
-    den = np.sqrt(den)
-    sine = 1 / den
-    cosine = - omegatau / den
-    sineval = sine * np.cos(phi_1) + cosine * np.sin(phi_1)
-    vout = v_in / np.sqrt(omegatau ** (-2) + 1)
-    return vout * sineval
+    return _voutcossin_from_theory(frequency, tau, v_in, phi_1)[1]
+
+
+def calc_voutsinphi_from_theory_jac(
+    frequency: _Array1D,
+    tau: np.floating[Any],
+    v_in: np.floating[Any],
+    phi_1: np.floating[Any] | None = None
+) -> np.ndarray:
+    """The Jacobian of :func:`calc_voutsinphi_from_theory`.
+
+    Parameters
+    ----------
+    frequency : _Array1D
+        The frequency data.
+    tau : floating[Any]
+        The time constant.
+    v_in : floating[Any]
+        The input voltage.
+    phi_1 : floating[Any] | None, optional
+        The phase change of the voltage follower.
+        When this is omitted the fit does not carry ``phi_1``,
+        so its column is left out of the Jacobian.
+
+    Returns
+    -------
+    jacobian : np.ndarray
+        The ``(N, 3)`` array of the partial derivatives with respect
+        to ``tau``, ``v_in`` and ``phi_1``, or the ``(N, 2)`` array
+        without the ``phi_1`` column when ``phi_1`` is omitted.
+
+    See Also
+    --------
+    calc_voutcosphi_from_theory_jac : for usage.
+    """
+    nophi1 = phi_1 is None
+    if nophi1:
+        phi_1 = 0
+    omega = _omega(frequency)
+    omegatau = tau * omega
+    inv_sq = 1 / (omegatau * omegatau + 1)
+    c1 = np.cos(phi_1)
+    s1 = np.sin(phi_1)
+    dvin = (omegatau * c1 - omegatau * omegatau * s1) * inv_sq
+    dtau = (
+        v_in * omega
+        * ((1 - omegatau * omegatau) * c1 - 2 * omegatau * s1)
+        * inv_sq * inv_sq
+    )
+    if nophi1:
+        return np.stack((dtau, dvin), axis=-1)
+    dphi = -v_in * (omegatau * s1 + omegatau * omegatau * c1) * inv_sq
+    return np.stack((dtau, dvin, dphi), axis=-1)
@@ -26,4 +26,5 @@ Orthological-Phase Component
 """
 from ._gain import *
 from ._voutc import *
+from ._voutcs import _voutcossin_from_theory
 from ._vouts import *
@@ -1,11 +1,42 @@
 ﻿"""This calculates the gain of the low-pass filter."""
 import numpy as np
+from math import log as _log
 from ..highpass import calc_gain_direct
 from typing import Any
 from .._types import _Array1D
+from .._cache import _omega
+
+_LN10 = _log(10)
+try:
+    from .. import _kernels as _ckernels
+except ImportError:
+    _ckernels = None
+try:
+    from numba import njit as _njit
+except ImportError:
+    _njit = None
+try:
+    import numexpr as _ne
+except ImportError:
+    _ne = None
 
 calc_gain_direct = calc_gain_direct
 
+if _njit is not None:
+    @_njit(cache=True, fastmath=True)
+    def _gain_core(frequency: np.ndarray, tau: float) -> np.ndarray:
+        """The compiled scalar loop behind ``calc_gain_from_theory``."""
+        n = frequency.shape[0]
+        gain = np.empty(n, frequency.dtype)
+        for i in range(n):
+            tauomega = 2 * np.pi * tau * frequency[i]
+            gain[i] = -10 * np.log10(tauomega * tauomega + 1)
+        return gain
+
+    _gain_core(np.ones(1), 1.0)
+else:
+    _gain_core = None
+
 
 def calc_gain_from_theory(
     frequency: _Array1D,
@@ -25,5 +56,51 @@ def calc_gain_from_theory(
     gain : _Array1D
         The gain.
     """
-    tauomega = 2 * np.pi * tau * frequency
-    return 10 * np.log10(1 / (tauomega ** 2 + 1))
+    if (
+        _ckernels is not None
+        and isinstance(frequency, np.ndarray)
+        and frequency.dtype in (np.float32, np.float64)
+    ):
+        return _ckernels.gain_lp(frequency, float(tau))
+    if (
+        _gain_core is not None
+        and isinstance(frequency, np.ndarray)
+        and frequency.dtype in (np.float32, np.float64)
+    ):
+        return _gain_core(frequency, float(tau))
+    tauomega = tau * _omega(frequency)
+    if _ne is not None:
+        return _ne.evaluate(
+            '-10.0 * log10(tauomega * tauomega + 1.0)',
+            local_dict={'tauomega': tauomega}
+        )
+    return -10 * np.log10(tauomega * tauomega + 1)
+
+
+def calc_gain_from_theory_jac(
+    frequency: _Array1D,
+    tau: np.floating[Any]
+) -> np.ndarray:
+    """The Jacobian of :func:`calc_gain_from_theory`.
+
+    Parameters
+    ----------
+    frequency : _Array1D
+        The frequency.
+    tau : floating[Any]
+        The time constant.
+
+    Returns
+    -------
+    jacobian : np.ndarray
+        The ``(N, 1)`` array of the derivative of the gain
+        with respect to ``tau``.
+
+    See Also
+    --------
+    functions.highpass.calc_gain_from_theory_jac : for details.
+    """
+    omega = _omega(frequency)
+    tauomega = tau * omega
+    dgain = -20 * tauomega * omega / (_LN10 * (tauomega * tauomega + 1))
+    return dgain.reshape(-1, 1)
@@ -10,6 +10,8 @@ from ..highpass import _voutc
 from typing import Any
 import numpy as np
 from .._types import _Array1D
+from .._cache import _omega
+from ._voutcs import _voutcossin_from_theory
 
 calc_voutcosphi_direct = _voutc.calc_voutcosphi_direct
 
@@ -41,16 +43,62 @@ def calc_voutcosphi_from_theory(
     Notes
     -----
     Please do not call this function directly.
-    Instead, please give this to ``scipy.optimize.curve_fit``.
+    Instead, please give this to ``scipy.optimize.least_squares``.
 
     See Also
     --------
     functions.highpass.calc_voutcosphi_from_theory : for details.
     """
-    tauomega = 2 * np.pi * tau * frequency
-    den = np.sqrt(tauomega ** 2 + 1)
-    cosine = 1 / den
-    sine = tauomega / den
-    cosineval = cosine * np.cos(phi_1) - sine * np.sin(phi_1)
-    v_out = v_in / den
-    return v_out * cosineval
+    return _voutcossin_from_theory(frequency, tau, v_in, phi_1)[0]
+
+
+def calc_voutcosphi_from_theory_jac(
+    frequency: _Array1D,
+    tau: np.floating[Any],
+    v_in: np.floating[Any],
+    phi_1: np.floating[Any] | None = None
+) -> np.ndarray:
+    """The Jacobian of :func:`calc_voutcosphi_from_theory`.
+
+    Parameters
+    ----------
+    frequency : _Array1D
+        The frequency data.
+    tau : floating[Any]
+        The time constant.
+    v_in : floating[Any]
+        The input voltage.
+    phi_1 : floating[Any] | None, optional
+        The phase change of the voltage follower.
+        When this is omitted the fit does not carry ``phi_1``,
+        so its column is left out of the Jacobian.
+
+    Returns
+    -------
+    jacobian : np.ndarray
+        The ``(N, 3)`` array of the partial derivatives with respect
+        to ``tau``, ``v_in`` and ``phi_1``, or the ``(N, 2)`` array
+        without the ``phi_1`` column when ``phi_1`` is omitted.
+
+    See Also
+    --------
+    functions.highpass.calc_voutcosphi_from_theory_jac : for usage.
+    """
+    nophi1 = phi_1 is None
+    if nophi1:
+        phi_1 = 0
+    omega = _omega(frequency)
+    omegatau = tau * omega
+    inv_sq = 1 / (omegatau * omegatau + 1)
+    c1 = np.cos(phi_1)
+    s1 = np.sin(phi_1)
+    dvin = (c1 - omegatau * s1) * inv_sq
+    dtau = (
+        v_in * omega
+        * ((omegatau * omegatau - 1) * s1 - 2 * omegatau * c1)
+        * inv_sq * inv_sq
+    )
+    if nophi1:
+        return np.stack((dtau, dvin), axis=-1)
+    dphi = -v_in * (s1 + omegatau * c1) * inv_sq
+    return np.stack((dtau, dvin, dphi), axis=-1)